@@ -1,22 +1,28 @@
 # Orchestrator for an "agentic" offline data scientist pipeline.
 # Handles dataset loading, profiling, planning, training, evaluation, reflection,
 # and optional re-planning cycles. Designed primarily for classification tasks.
+import hashlib
 import os
 import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+from time import time
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
-# Agent components and tooling used by the orchestrator
-from agents.planner import create_plan
-from agents.reflector import reflect, should_replan, apply_replan_strategy
+# Only the lightweight memory component is imported eagerly; planner,
+# reflector and the sklearn/matplotlib-heavy tools are imported inside run()
+# so that constructing the agent (and module import) stays cheap.
 from agents.memory import JSONMemory
-from tools.data_profiler import profile_dataset, infer_target_column, dataset_fingerprint
-from tools.modelling import build_preprocessor, select_models, train_models
-from tools.evaluation import evaluate_best, write_markdown_report, save_json
+
+
+# CSVs at or above this size are streamed batch-by-batch rather than parsed
+# via a single whole-file read, bounding the parser's transient memory.
+STREAM_THRESHOLD_BYTES = 256 << 20
 
 
 # Lightweight container for run metadata and parameters
@@ -32,9 +38,16 @@ class RunContext:
     max_replans: int
 
 
+@lru_cache(maxsize=1)
+def _iso_for_second(ts: int) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
 def now_iso() -> str:
     """Return current UTC time in ISO 8601 format (no microseconds) with Z suffix."""
-    return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    # Second-resolution output, so calls within the same second reuse the
+    # formatted string; also avoids the deprecated datetime.utcnow().
+    return _iso_for_second(int(time()))
 
 
 class AgenticDataScientist:
@@ -59,16 +72,63 @@ class AgenticDataScientist:
         # Context and transient state populated when run() is executed
         self.ctx: Optional[RunContext] = None
         self.state: Dict[str, Any] = {}
+        # Digest of the last-written content per artefact path, used to skip
+        # redundant writes across replan iterations
+        self._last_digest: Dict[str, bytes] = {}
 
     def log(self, msg: str) -> None:
         """Print a log message when verbose is enabled."""
         if self.verbose:
             print(f"[AgenticDataScientist] {msg}")
 
+    def save_json_if_changed(self, path: str, obj: Any) -> None:
+        """
+        Serialize obj once and write it only if the content differs from what
+        was last written to `path`. Replan iterations re-save every artefact,
+        but e.g. the profile rarely changes between iterations.
+        """
+        from tools.evaluation import dumps_json
+
+        payload = dumps_json(obj)
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+        if self._last_digest.get(path) == digest:
+            return
+        with open(path, "wb") as f:
+            f.write(payload)
+        self._last_digest[path] = digest
+
     def load_data(self, path: str) -> pd.DataFrame:
         """Load a CSV into a pandas DataFrame and log its shape."""
         self.log(f"Loading dataset: {path}")
-        df = pd.read_csv(path)
+        try:
+            # Prefer PyArrow's multithreaded CSV reader: it parses 8 MB blocks
+            # in parallel instead of pandas' single-threaded C parser.
+            import pyarrow.csv as pacsv
+
+            read_options = pacsv.ReadOptions(use_threads=True, block_size=8 << 20)
+            if os.path.getsize(path) >= STREAM_THRESHOLD_BYTES:
+                # Incremental reader: decodes one batch at a time so peak
+                # memory stays near the final table size, not table + the
+                # whole raw file buffered by the one-shot reader.
+                with pacsv.open_csv(path, read_options=read_options) as reader:
+                    table = reader.read_all()
+            else:
+                table = pacsv.read_csv(path, read_options=read_options)
+            # self_destruct frees Arrow buffers as columns are handed to pandas,
+            # keeping peak memory close to a single copy of the data.
+            df = table.to_pandas(self_destruct=True)
+        except ImportError:
+            # pyarrow is optional; fall back to the stock pandas reader.
+            df = pd.read_csv(path)
+
+        # Store repetitive string columns as category dtype: value_counts,
+        # nunique and one-hot encoding all operate on integer codes instead of
+        # Python string objects, and memory drops several-fold.
+        n = len(df)
+        for c in df.select_dtypes(include="object").columns:
+            if df[c].nunique(dropna=True) <= max(50, int(0.5 * n)):
+                df[c] = df[c].astype("category")
+
         self.log(f"Loaded {df.shape[0]} rows × {df.shape[1]} cols")
         return df
 
@@ -93,8 +153,17 @@ class AgenticDataScientist:
 
         Returns: path to the output directory for this run
         """
+        # Deferred imports: pulling in sklearn/matplotlib only when a run
+        # actually starts keeps CLI startup (argparse, --help) fast.
+        from agents.planner import create_plan
+        from agents.reflector import reflect, should_replan, apply_replan_strategy
+        from tools.data_profiler import profile_dataset, infer_target_column, dataset_fingerprint
+        from tools.profile_cache import load_or_compute
+        from tools.modelling import build_preprocessor, select_models, train_models
+        from tools.evaluation import evaluate_best, write_markdown_report
+
         # Create a unique run id and output directory for artefacts
-        run_id = datetime.utcnow().strftime("%Y%m%d_%H%M%S") + "_" + str(uuid.uuid4())[:8]
+        run_id = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S") + "_" + str(uuid.uuid4())[:8]
         output_dir = os.path.join(output_root, run_id)
         os.makedirs(output_dir, exist_ok=True)
 
@@ -111,6 +180,7 @@ class AgenticDataScientist:
         )
         # Internal state used to track replanning attempts
         self.state = {"replan_count": 0}
+        self._last_digest = {}
 
         # Load dataset into memory
         df = self.load_data(data_path)
@@ -124,9 +194,17 @@ class AgenticDataScientist:
             self.ctx.target = inferred
             self.log(f"Inferred target: {inferred}")
 
-        # Produce a dataset profile (EDA summary) and a fingerprint used for memory
-        profile = profile_dataset(df, self.ctx.target)
-        fp = dataset_fingerprint(df, self.ctx.target)
+        # Produce a dataset profile (EDA summary) and a fingerprint used for memory.
+        # Both are memoized on disk keyed on file identity, so repeat runs on an
+        # unchanged dataset skip the full-column EDA scan.
+        profile = load_or_compute(
+            data_path, self.ctx.target, "profile",
+            lambda: profile_dataset(df, self.ctx.target),
+        )
+        fp = load_or_compute(
+            data_path, self.ctx.target, "fingerprint",
+            lambda: dataset_fingerprint(df, self.ctx.target),
+        )
 
         # Look up previous runs for the same dataset fingerprint (memory hint)
         prev = self.memory.get_dataset_record(fp)
@@ -145,7 +223,9 @@ class AgenticDataScientist:
             candidates = select_models(profile, seed=self.ctx.seed)
             self.log(f"Candidate models: {[n for n, _ in candidates]}")
 
-            # Train candidate models and persist intermediate artefacts
+            # Train candidate models and persist intermediate artefacts.
+            # The fitted-model cache lives under the shared output root (not
+            # the per-run dir) so identical re-runs across run ids hit it.
             results = train_models(
                 df=df,
                 target=self.ctx.target,
@@ -155,6 +235,8 @@ class AgenticDataScientist:
                 test_size=self.ctx.test_size,
                 output_dir=self.ctx.output_dir,
                 verbose=self.verbose,
+                fingerprint=fp,
+                cache_dir=os.path.join(output_root, ".mcache"),
             )
 
             # Evaluate the trained models and pick the best one
@@ -167,22 +249,36 @@ class AgenticDataScientist:
                 all_metrics=eval_payload["all_metrics"],
             )
 
-            # Persist core run artefacts for later review
-            save_json(os.path.join(self.ctx.output_dir, "eda_summary.json"), profile)
-            save_json(os.path.join(self.ctx.output_dir, "plan.json"), {"plan": plan})
-            save_json(os.path.join(self.ctx.output_dir, "metrics.json"), eval_payload)
-            save_json(os.path.join(self.ctx.output_dir, "reflection.json"), reflection)
-
-            # Generate a human-readable markdown report summarising the run
-            write_markdown_report(
-                out_path=os.path.join(self.ctx.output_dir, "report.md"),
-                ctx=self.ctx,
-                fingerprint=fp,
-                dataset_profile=profile,
-                plan=plan,
-                eval_payload=eval_payload,
-                reflection=reflection,
-            )
+            # Persist core run artefacts for later review (unchanged content
+            # is detected via digest and not rewritten on replan iterations).
+            # The writes are independent small-file I/O, so they are submitted
+            # to a thread pool and overlapped; the pool context waits for all
+            # of them before the memory update below.
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                futures = [
+                    pool.submit(self.save_json_if_changed,
+                                os.path.join(self.ctx.output_dir, "eda_summary.json"), profile),
+                    pool.submit(self.save_json_if_changed,
+                                os.path.join(self.ctx.output_dir, "plan.json"), {"plan": plan}),
+                    pool.submit(self.save_json_if_changed,
+                                os.path.join(self.ctx.output_dir, "metrics.json"), eval_payload),
+                    pool.submit(self.save_json_if_changed,
+                                os.path.join(self.ctx.output_dir, "reflection.json"), reflection),
+                    # Human-readable markdown report summarising the run
+                    pool.submit(
+                        write_markdown_report,
+                        out_path=os.path.join(self.ctx.output_dir, "report.md"),
+                        ctx=self.ctx,
+                        fingerprint=fp,
+                        dataset_profile=profile,
+                        plan=plan,
+                        eval_payload=eval_payload,
+                        reflection=reflection,
+                    ),
+                ]
+            # Re-raise any write failure instead of silently dropping it
+            for f in futures:
+                f.result()
 
             # Update the memory store with outcomes from this run
             self.memory.upsert_dataset_record(fp, {
@@ -2,46 +2,118 @@ import json
 import os
 import shutil
 from typing import Any, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+from time import time
+
+# orjson serializes in C, several times faster than stdlib json; optional.
+try:
+    import orjson
+
+    def _dump_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def _load_bytes(raw: bytes) -> Any:
+        return orjson.loads(raw)
+except ImportError:
+    def _dump_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def _load_bytes(raw: bytes) -> Any:
+        return json.loads(raw)
+
+# Compact the append-only log into the snapshot once it grows past this size.
+COMPACT_THRESHOLD_BYTES = 1 << 20  # 1 MB
+
+
+@lru_cache(maxsize=1)
+def _iso_for_second(ts: int) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
 def now_iso() -> str:
-    return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    # Cached per second; avoids the deprecated datetime.utcnow().
+    return _iso_for_second(int(time()))
 
 
 class JSONMemory:
     """
     Lightweight persistent memory for the agent.
     Stores dataset fingerprint -> best model/metrics and notes.
+
+    Updates are appended as one-line JSON deltas to a sidecar .jsonl log
+    (O(1) per update) instead of rewriting the whole store each time; the
+    consolidated JSON snapshot is only rewritten when the log is compacted.
     """
 
     def __init__(self, path: str = "agent_memory.json"):
         self.path = path
+        self.log_path = os.path.splitext(path)[0] + ".jsonl"
         self.data: Dict[str, Any] = {"datasets": {}, "notes": []}
         self._load()
 
     def _load(self) -> None:
-        if not os.path.exists(self.path):
-            return
-        try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                self.data = json.load(f)
-        except Exception:
-            backup = self.path + ".bak"
-            shutil.copy(self.path, backup)
-            self.data = {"datasets": {}, "notes": [{"ts": now_iso(), "msg": f"Memory reset; backup at {backup}"}]}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "rb") as f:
+                    self.data = _load_bytes(f.read())
+            except Exception:
+                backup = self.path + ".bak"
+                shutil.copy(self.path, backup)
+                self.data = {"datasets": {}, "notes": [{"ts": now_iso(), "msg": f"Memory reset; backup at {backup}"}]}
+        # Replay deltas appended since the last compaction. A torn final line
+        # (crash mid-append) is skipped rather than discarding the whole log.
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self._apply(_load_bytes(line))
+                    except Exception:
+                        continue
+
+    def _apply(self, op: Dict[str, Any]) -> None:
+        """Apply one logged delta to the in-memory state."""
+        if op.get("op") == "upsert":
+            self.data.setdefault("datasets", {})[op["fp"]] = op["rec"]
+        elif op.get("op") == "note":
+            self.data.setdefault("notes", []).append(op["note"])
+
+    def _append(self, op: Dict[str, Any]) -> None:
+        """Append one delta to the log, compacting when the log gets large."""
+        with open(self.log_path, "ab") as f:
+            f.write(_dump_bytes(op) + b"\n")
+        if os.path.getsize(self.log_path) >= COMPACT_THRESHOLD_BYTES:
+            self.compact()
 
     def save(self) -> None:
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, indent=2)
+        """
+        Write the consolidated snapshot (compact form, no indentation).
+
+        Writes to a temp file then os.replace()s it over the snapshot, which
+        is atomic on POSIX and Windows: a crash mid-write can no longer leave
+        a truncated snapshot that trips the backup/reset branch in _load.
+        """
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_dump_bytes(self.data))
+        os.replace(tmp, self.path)
+
+    def compact(self) -> None:
+        """Fold the delta log into the snapshot and truncate the log."""
+        self.save()
+        open(self.log_path, "w", encoding="utf-8").close()
 
     def get_dataset_record(self, fingerprint: str) -> Optional[Dict[str, Any]]:
         return self.data.get("datasets", {}).get(fingerprint)
 
     def upsert_dataset_record(self, fingerprint: str, record: Dict[str, Any]) -> None:
         self.data.setdefault("datasets", {})[fingerprint] = record
-        self.save()
+        self._append({"op": "upsert", "fp": fingerprint, "rec": record})
 
     def add_note(self, msg: str) -> None:
-        self.data.setdefault("notes", []).append({"ts": now_iso(), "msg": msg})
-        self.save()
+        note = {"ts": now_iso(), "msg": msg}
+        self.data.setdefault("notes", []).append(note)
+        self._append({"op": "note", "note": note})
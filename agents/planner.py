@@ -16,6 +16,24 @@ TODO: Extend this module with:
 
 from typing import Any, Dict, List, Optional
 
+# Precomputed plan templates: create_plan selects one instead of rebuilding
+# the task list (and running a linear .index() search) on every call.
+_BASE_PLAN = (
+    "profile_dataset",
+    "build_preprocessor",
+    "select_models",
+    "train_models",
+    "evaluate",
+    "reflect",
+    "write_report",
+)
+# Variant with the imbalance step already inserted before train_models.
+_IMBALANCED_PLAN = (
+    _BASE_PLAN[:_BASE_PLAN.index("train_models")]
+    + ("consider_imbalance_strategy",)
+    + _BASE_PLAN[_BASE_PLAN.index("train_models"):]
+)
+
 
 def create_plan(
     dataset_profile: Dict[str, Any], 
@@ -54,25 +72,12 @@ def create_plan(
     - Add preprocessing steps based on data quality
     """
     
-    # Basic plan structure (students should make this much more sophisticated)
-    plan: List[str] = [
-        "profile_dataset",
-        "build_preprocessor",
-        "select_models",
-        "train_models",
-        "evaluate",
-        "reflect",
-        "write_report",
-    ]
-    
-    # TODO: Add sophisticated logic here
-    # Example: Check for imbalance
+    # Select a precomputed template (students should add more variants)
+    # TODO: Make this more sophisticated
+    # Consider: SMOTE, class weights, threshold tuning, etc.
     imb = dataset_profile.get("imbalance_ratio") or 1.0
-    if imb >= 3.0:
-        # TODO: Make this more sophisticated
-        # Consider: SMOTE, class weights, threshold tuning, etc.
-        plan.insert(plan.index("train_models"), "consider_imbalance_strategy")
-    
+    plan: List[str] = list(_IMBALANCED_PLAN if imb >= 3.0 else _BASE_PLAN)
+
     # TODO: Add logic for small datasets
     # if dataset_profile["shape"]["rows"] < 1000:
     #     plan.append("apply_regularization")
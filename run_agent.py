@@ -1,5 +1,5 @@
 import argparse
-from agentic_data_scientist import AgenticDataScientist
+import os
 
 
 def main() -> None:
@@ -13,6 +13,13 @@ def main() -> None:
     parser.add_argument("--quiet", action="store_true", help="Reduce logs")
     args = parser.parse_args()
 
+    # Import only after argument parsing succeeded: --help and usage errors
+    # should not pay the pandas/sklearn/matplotlib import cost. The headless
+    # backend is pinned before matplotlib is (transitively) imported so no
+    # GUI backend probing happens.
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    from agentic_data_scientist import AgenticDataScientist
+
     agent = AgenticDataScientist(verbose=not args.quiet)
     out_dir = agent.run(
         data_path=args.data,
@@ -28,7 +28,7 @@ def main() -> None:
     out_dir = result.stdout.strip().splitlines()[-1].strip()
     print("Output dir:", out_dir)
 
-    expected = ["report.md", "metrics.json", "reflection.json", "eda_summary.json", "confusion_matrix.png"]
+    expected = ["report.md", "metrics.json", "reflection.json", "eda_summary.json", "confusion_matrix.svg"]
     missing = [f for f in expected if not os.path.exists(os.path.join(out_dir, f))]
     if missing:
         raise SystemExit(f"Missing expected outputs: {missing}")
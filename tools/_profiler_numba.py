@@ -0,0 +1,49 @@
+"""
+Optional Numba-accelerated reductions for profile_dataset.
+
+Computes NaN counts and unique counts for every numeric column in one fused,
+thread-parallel pass over the 2D block, instead of one pandas call per
+column. Importing this module never fails: when numba is unavailable,
+`col_stats` is None and callers use the pandas path.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _col_stats_jit(a):  # pragma: no cover - compiled code
+        n_rows, n_cols = a.shape
+        nan_counts = np.zeros(n_cols, np.int64)
+        unique_counts = np.zeros(n_cols, np.int64)
+        for j in prange(n_cols):
+            # Sort puts NaNs last, so uniques are counted as value transitions
+            # over the non-NaN prefix in a single scan.
+            col = np.sort(a[:, j])
+            nans = 0
+            uniq = 0
+            prev = 0.0
+            for i in range(n_rows):
+                v = col[i]
+                if np.isnan(v):
+                    nans += 1
+                elif uniq == 0 or v != prev:
+                    uniq += 1
+                    prev = v
+            nan_counts[j] = nans
+            unique_counts[j] = uniq
+        return nan_counts, unique_counts
+
+    def col_stats(block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (nan_counts, unique_counts) per column of a numeric block."""
+        a = np.ascontiguousarray(block, dtype=np.float64)
+        return _col_stats_jit(a)
+else:
+    col_stats = None
@@ -1,6 +1,17 @@
+import hashlib
 from typing import Any, Dict, Optional
+
+import numpy as np
 import pandas as pd
 
+from tools._profiler_numba import col_stats
+
+# Above this many rows, column statistics are estimated from a random sample:
+# the planner/reflector thresholds they feed (imbalance >= 3.0, missingness
+# bands) are far coarser than the sampling error at this sample size.
+SAMPLE_THRESHOLD_ROWS = 200_000
+SAMPLE_SIZE = 100_000
+
 
 def infer_target_column(df: pd.DataFrame) -> Optional[str]:
     """
@@ -8,11 +19,13 @@ def infer_target_column(df: pd.DataFrame) -> Optional[str]:
       - prefer common target-like column names
       - else last column if it has relatively low cardinality
     """
-    candidates = ["target", "label", "class", "y", "outcome"]
-    lower_map = {c.lower(): c for c in df.columns}
-    for k in candidates:
-        if k in lower_map:
-            return lower_map[k]
+    # Vectorized name matching: lowercase all column names in one C pass and
+    # probe with np.where instead of building a Python dict.
+    lower = df.columns.astype(str).str.lower()
+    for cand in ("target", "label", "class", "y", "outcome"):
+        idx = np.where(lower == cand)[0]
+        if idx.size:
+            return str(df.columns[idx[0]])
 
     last = df.columns[-1]
     uniq = df[last].nunique(dropna=True)
@@ -30,11 +43,24 @@ def is_classification_target(series: pd.Series) -> bool:
 
 
 def dataset_fingerprint(df: pd.DataFrame, target: str) -> str:
-    cols = ",".join(df.columns.astype(str).tolist())
-    shape = f"{df.shape[0]}x{df.shape[1]}"
-    base = f"{shape}|{target}|{cols}"
-    h = abs(hash(base)) % (10**12)
-    return f"fp_{h}"
+    """
+    Stable content-aware fingerprint for a dataset/target pair.
+
+    Uses blake2b over shape, target, column names, dtypes and a sample of the
+    leading columns' values. Unlike Python's salted hash(), this is
+    deterministic across processes, so memory lookups keyed on the
+    fingerprint survive restarts; the content sample also distinguishes
+    datasets that merely share a schema.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update(np.array(df.shape, dtype=np.int64).tobytes())
+    h.update(str(target).encode())
+    h.update(",".join(map(str, df.columns)).encode())
+    h.update(",".join(str(t) for t in df.dtypes).encode())
+    # Sample content of the first few columns via pandas' vectorized hasher.
+    for c in df.columns[:8]:
+        h.update(pd.util.hash_pandas_object(df[c].head(1024), index=False).values.tobytes())
+    return "fp_" + h.hexdigest()
 
 
 def profile_dataset(df: pd.DataFrame, target: str) -> Dict[str, Any]:
@@ -44,37 +70,97 @@ def profile_dataset(df: pd.DataFrame, target: str) -> Dict[str, Any]:
     y = df[target]
     profile: Dict[str, Any] = {}
 
+    cols = df.columns.astype(str).tolist()
     profile["shape"] = {"rows": int(df.shape[0]), "cols": int(df.shape[1])}
-    profile["columns"] = df.columns.astype(str).tolist()
-
-    missing = (df.isna().mean() * 100).round(2).to_dict()
-    profile["missing_pct"] = {str(k): float(v) for k, v in missing.items()}
+    profile["columns"] = cols
+
+    # Large datasets: estimate per-column stats from a fixed-size sample so
+    # profiling cost stops growing with row count. Class counts are still
+    # computed on the full target column (single column, cheap).
+    sampled = len(df) > SAMPLE_THRESHOLD_ROWS
+    stats_df = df.sample(n=SAMPLE_SIZE, random_state=0) if sampled else df
+
+    # Missingness and unique counts without a full-frame boolean temporary:
+    # the numeric block is reduced in one pass (a fused, thread-parallel
+    # Numba kernel when available, otherwise np.isnan + frame-level nunique);
+    # only the remaining (object/category/extension) columns fall back to the
+    # allocating pandas paths.
+    np_num_mask = df.dtypes.apply(
+        lambda t: isinstance(t, np.dtype) and t.kind in "fiub"
+    ).to_numpy()
+    missing: Dict[str, float] = {}
+    nunique: Dict[str, int] = {}
+    n_rows = len(stats_df)
+    num_block_cols = stats_df.columns[np_num_mask]
+    other_cols = stats_df.columns[~np_num_mask]
+    if len(num_block_cols):
+        # dtype="float64" keeps mixed int/bool/float blocks isnan-compatible.
+        block = stats_df[num_block_cols].to_numpy(dtype="float64")
+        if col_stats is not None and n_rows:
+            nan_counts, uniq_counts = col_stats(block)
+            for c, nc, uc in zip(num_block_cols, nan_counts, uniq_counts):
+                missing[str(c)] = round(float(nc) / n_rows * 100, 2)
+                nunique[str(c)] = int(uc)
+        else:
+            pct = np.isnan(block).mean(axis=0) * 100
+            missing.update({str(c): round(float(v), 2) for c, v in zip(num_block_cols, pct)})
+            for k, v in stats_df[num_block_cols].nunique(dropna=True).items():
+                nunique[str(k)] = int(v)
+    if len(other_cols):
+        pct = pd.isna(stats_df[other_cols]).to_numpy().mean(axis=0) * 100
+        missing.update({str(c): round(float(v), 2) for c, v in zip(other_cols, pct)})
+        for k, v in stats_df[other_cols].nunique(dropna=True).items():
+            nunique[str(k)] = int(v)
+    # Re-emit in original column order for stable artefacts.
+    profile["missing_pct"] = {c: missing[c] for c in cols}
 
     profile["target"] = str(target)
     profile["target_dtype"] = str(y.dtype)
     profile["is_classification"] = bool(is_classification_target(y))
 
-    # Feature types
-    X = df.drop(columns=[target])
-    numeric_cols = X.select_dtypes(include=["number", "bool"]).columns.astype(str).tolist()
-    cat_cols = [c for c in X.columns.astype(str).tolist() if c not in numeric_cols]
+    # Feature types: classify dtypes in one scan and split by boolean mask,
+    # reusing the stringified column list computed once at the top instead of
+    # re-materializing the index (and a dropped copy of the frame) here.
+    # Note: keep this mask-based — a list-membership split ("c not in
+    # numeric_cols") is O(cols^2) on wide frames.
+    feat_mask = np.ones(len(cols), dtype=bool)
+    feat_mask[df.columns.get_loc(target)] = False
+    num_mask = df.dtypes.apply(
+        lambda t: pd.api.types.is_numeric_dtype(t) or pd.api.types.is_bool_dtype(t)
+    ).to_numpy()
+    cols_arr = np.asarray(cols, dtype=object)
+    numeric_cols = cols_arr[num_mask & feat_mask].tolist()
+    cat_cols = cols_arr[~num_mask & feat_mask].tolist()
 
     profile["feature_types"] = {"numeric": numeric_cols, "categorical": cat_cols}
-    profile["n_unique_by_col"] = {str(c): int(df[c].nunique(dropna=True)) for c in df.columns.astype(str)}
+    profile["n_unique_by_col"] = {c: nunique[c] for c in cols}
 
     notes = []
+    if sampled:
+        notes.append(
+            f"Column statistics estimated from a {SAMPLE_SIZE}-row sample "
+            f"({profile['shape']['rows']} rows total)."
+        )
     if profile["shape"]["rows"] < 1000:
         notes.append("Small dataset (<1000 rows): prefer simpler models / guard against overfitting.")
     if profile["shape"]["cols"] > 100:
         notes.append("High dimensionality (>100 columns): watch one-hot expansion and overfitting.")
     profile["notes"] = notes
 
-    # Class balance if classification
+    # Class balance if classification. np.unique counts classes in one
+    # C-level pass on the raw array; for category dtype we count the integer
+    # codes and map back, avoiding any per-value Python objects.
     if profile["is_classification"]:
-        vc = y.value_counts(dropna=False)
-        profile["class_counts"] = {str(k): int(v) for k, v in vc.items()}
-        if len(vc) >= 2:
-            ratio = float(vc.max() / max(vc.min(), 1))
+        if isinstance(y.dtype, pd.CategoricalDtype):
+            codes = y.cat.codes.to_numpy()
+            code_vals, counts = np.unique(codes[codes >= 0], return_counts=True)
+            vals = y.cat.categories[code_vals]
+        else:
+            arr = y.to_numpy()
+            vals, counts = np.unique(arr[~pd.isna(arr)], return_counts=True)
+        profile["class_counts"] = dict(zip(map(str, vals), map(int, counts)))
+        if counts.size >= 2:
+            ratio = float(counts.max() / max(int(counts.min()), 1))
         else:
             ratio = 1.0
         profile["imbalance_ratio"] = round(ratio, 3)
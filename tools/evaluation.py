@@ -1,59 +1,130 @@
+import io
 import os
 import json
 from dataclasses import asdict
 from typing import Any, Dict, List, Optional
 
 import numpy as np
-import matplotlib.pyplot as plt
+import pandas as pd
 
-from sklearn.metrics import confusion_matrix, classification_report
+# matplotlib and sklearn.metrics are imported inside the functions that use
+# them: importing this module (e.g. for save_json / the markdown report on a
+# cached result) then costs neither the ~1s matplotlib import nor its RSS.
+
+# orjson serializes in C (with native numpy-scalar support); optional.
+try:
+    import orjson
+
+    def dumps_json(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    def dumps_json(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
 
 
 def save_json(path: str, obj: Any) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, indent=2, ensure_ascii=False)
+    # Serialize to bytes once and write directly; skips UTF-8 re-encoding.
+    with open(path, "wb") as f:
+        f.write(dumps_json(obj))
 
 
 def plot_confusion_matrix(cm: np.ndarray, labels: List[str], out_path: str, title: str) -> None:
-    plt.figure()
-    plt.imshow(cm, interpolation="nearest")
-    plt.title(title)
-    plt.colorbar()
-    ticks = np.arange(len(labels))
-    plt.xticks(ticks, labels, rotation=45, ha="right")
-    plt.yticks(ticks, labels)
+    # Headless raster backend for batch report generation: no GUI backend
+    # probing, no display needed at render time.
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    # Size the figure by class count up front; a constant-time margin adjust
+    # then replaces tight_layout's iterative solver, and dropping
+    # bbox_inches="tight" avoids rendering the figure twice.
+    k = len(labels)
+    fig, ax = plt.subplots(figsize=(max(6.0, 0.4 * k), max(5.0, 0.4 * k)))
+    im = ax.imshow(cm, interpolation="nearest")
+    ax.set_title(title)
+    fig.colorbar(im, ax=ax)
+    ticks = np.arange(k)
+    ax.set_xticks(ticks, labels=labels, rotation=45, ha="right")
+    ax.set_yticks(ticks, labels=labels)
 
     thresh = cm.max() / 2 if cm.size else 0
-    for i in range(cm.shape[0]):
-        for j in range(cm.shape[1]):
-            plt.text(
-                j, i, format(int(cm[i, j]), "d"),
-                ha="center", va="center",
-                color="white" if cm[i, j] > thresh else "black",
-            )
-
-    plt.ylabel("True label")
-    plt.xlabel("Predicted label")
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=160, bbox_inches="tight")
-    plt.close()
+    # Precompute every cell label and color vectorized, then place the
+    # annotations in one flat loop: no per-cell format() calls or scalar
+    # cm[i, j] indexing inside the hot loop.
+    texts = cm.astype(np.int64).astype(str)
+    colors = np.where(cm > thresh, "white", "black")
+    for (i, j), txt, col in zip(np.ndindex(*cm.shape), texts.ravel(), colors.ravel()):
+        ax.text(j, i, txt, ha="center", va="center", color=col)
+
+    ax.set_ylabel("True label")
+    ax.set_xlabel("Predicted label")
+    fig.subplots_adjust(bottom=0.18, left=0.18)
+    # Vector output: the SVG backend just serializes drawing primitives,
+    # skipping Agg's anti-aliased rasterization pass entirely (and DPI with
+    # it). Format is inferred from the .svg extension.
+    fig.savefig(out_path)
+    plt.close(fig)
+
+
+def _report_from_cm(cm: np.ndarray, labels: List[str]) -> str:
+    """
+    Render an sklearn-style classification report from an existing confusion
+    matrix. Per-class precision/recall/F1/support all derive from the cm's
+    row/column sums, so y_test/y_pred are not re-scanned (sklearn's
+    classification_report rebuilds the confusion matrix internally).
+    """
+    tp = np.diag(cm).astype(np.float64)
+    support = cm.sum(axis=1).astype(np.float64)
+    predicted = cm.sum(axis=0).astype(np.float64)
+    # np.maximum guards division by zero; zero numerators then yield 0.0,
+    # matching classification_report(zero_division=0).
+    precision = tp / np.maximum(predicted, 1)
+    recall = tp / np.maximum(support, 1)
+    f1 = 2 * precision * recall / np.maximum(precision + recall, 1e-12)
+
+    total = support.sum()
+    weights = support / max(total, 1)
+    width = max(max((len(l) for l in labels), default=0), len("weighted avg"))
+
+    lines = ["{:>{w}}  {:>9} {:>9} {:>9} {:>9}".format(
+        "", "precision", "recall", "f1-score", "support", w=width)]
+    lines.append("")
+    for i, label in enumerate(labels):
+        lines.append("{:>{w}}  {:>9.2f} {:>9.2f} {:>9.2f} {:>9.0f}".format(
+            label, precision[i], recall[i], f1[i], support[i], w=width))
+    lines.append("")
+    lines.append("{:>{w}}  {:>9} {:>9} {:>9.2f} {:>9.0f}".format(
+        "accuracy", "", "", tp.sum() / max(total, 1), total, w=width))
+    lines.append("{:>{w}}  {:>9.2f} {:>9.2f} {:>9.2f} {:>9.0f}".format(
+        "macro avg", precision.mean(), recall.mean(), f1.mean(), total, w=width))
+    lines.append("{:>{w}}  {:>9.2f} {:>9.2f} {:>9.2f} {:>9.0f}".format(
+        "weighted avg", (precision * weights).sum(), (recall * weights).sum(),
+        (f1 * weights).sum(), total, w=width))
+    return "\n".join(lines) + "\n"
 
 
 def evaluate_best(training_payload: Dict[str, Any], output_dir: str) -> Dict[str, Any]:
+    from sklearn.metrics import confusion_matrix
+
     best = training_payload["best"]
     all_metrics = training_payload["all_metrics"]
 
     y_test = best["y_test"]
     y_pred = best["y_pred"]
 
-    # Confusion matrix
-    cm = confusion_matrix(y_test, y_pred)
-    labels = sorted([str(x) for x in y_test.dropna().unique().tolist()])
-    cm_path = os.path.join(output_dir, "confusion_matrix.png")
+    # Confusion matrix, computed once over the union of observed/predicted
+    # labels (so plot axes and report rows are guaranteed to line up).
+    # np.unique sorts in one C pass, and astype(str) vectorizes the label
+    # stringification instead of N Python str() calls.
+    yt = np.asarray(y_test)
+    labels_arr = np.unique(np.concatenate([yt[~pd.isna(yt)], np.asarray(y_pred)]))
+    cm = confusion_matrix(y_test, y_pred, labels=labels_arr)
+    labels = labels_arr.astype(str).tolist()
+    cm_path = os.path.join(output_dir, "confusion_matrix.svg")
     plot_confusion_matrix(cm, labels, cm_path, f"Confusion Matrix: {best['name']}")
 
-    # Classification report
-    cls_report = classification_report(y_test, y_pred, zero_division=0)
+    # Classification report derived from the same confusion matrix
+    cls_report = _report_from_cm(cm, labels)
 
     return {
         "best_metrics": best["metrics"],
@@ -77,55 +148,69 @@ def write_markdown_report(
     def short_list(xs: List[str], n: int = 12) -> str:
         return ", ".join(xs[:n]) + (" ..." if len(xs) > n else "")
 
-    numeric = dataset_profile.get("feature_types", {}).get("numeric", [])
-    categorical = dataset_profile.get("feature_types", {}).get("categorical", [])
-    notes = dataset_profile.get("notes", [])
-
-    md = f"""# Agentic Data Scientist Report
-
-**Run ID:** `{ctx.run_id}`  
-**Started (UTC):** {ctx.started_at}  
-**Dataset:** `{ctx.data_path}`  
-**Target:** `{ctx.target}`  
-**Fingerprint:** `{fingerprint}`  
-
-## Dataset Profile
-- Rows: **{dataset_profile["shape"]["rows"]}**
-- Columns: **{dataset_profile["shape"]["cols"]}**
-- Classification: **{dataset_profile.get("is_classification")}**
-- Imbalance ratio: **{dataset_profile.get("imbalance_ratio")}**
-
-**Feature Types**
-- Numeric ({len(numeric)}): {short_list(numeric)}
-- Categorical ({len(categorical)}): {short_list(categorical)}
-
-**Notes**
-{chr(10).join([f"- {n}" for n in notes]) if notes else "- (none)"}
-
-## Plan
-{chr(10).join([f"- {t}" for t in plan])}
-
-## Results (Best Model)
-**Model:** `{best.get("model")}`
-
-- Accuracy: **{best.get("accuracy"):.3f}**
-- Balanced accuracy: **{best.get("balanced_accuracy"):.3f}**
-- Macro F1: **{best.get("f1_macro"):.3f}**
-- Macro Precision: **{best.get("precision_macro"):.3f}**
-- Macro Recall: **{best.get("recall_macro"):.3f}**
-
-Top metrics (all candidates):
-```json
-{json.dumps(eval_payload.get("all_metrics", []), indent=2)}
-```
-
-## Reflection
-{chr(10).join([f"- {s}" for s in reflection.get("suggestions", [])]) if reflection else "- (none)"}
-
-# Artefacts
-- Confusion matrix: {eval_payload.get("confusion_matrix_path")}
-
-"""
+    # Hoist the repeated nested lookups once; empty tuples as defaults avoid
+    # allocating throwaway dicts/lists per call.
+    ft = dataset_profile.get("feature_types") or {}
+    numeric = ft.get("numeric", ())
+    categorical = ft.get("categorical", ())
+    notes = dataset_profile.get("notes", ())
+    shape = dataset_profile["shape"]
+
+    # Serialize the metrics table once, outside the f-string, via the same
+    # orjson-backed encoder used for the JSON artefacts.
+    all_metrics_json = dumps_json(eval_payload.get("all_metrics", [])).decode("utf-8")
+
+    # Stream the report into a buffer section by section instead of one
+    # monolithic f-string: small format expressions, no second full-size
+    # string allocation before the write.
+    buf = io.StringIO()
+    w = buf.write
+    w("# Agentic Data Scientist Report\n\n")
+    w(f"**Run ID:** `{ctx.run_id}`  \n")
+    w(f"**Started (UTC):** {ctx.started_at}  \n")
+    w(f"**Dataset:** `{ctx.data_path}`  \n")
+    w(f"**Target:** `{ctx.target}`  \n")
+    w(f"**Fingerprint:** `{fingerprint}`  \n\n")
+
+    w("## Dataset Profile\n")
+    w(f"- Rows: **{shape['rows']}**\n")
+    w(f"- Columns: **{shape['cols']}**\n")
+    w(f"- Classification: **{dataset_profile.get('is_classification')}**\n")
+    w(f"- Imbalance ratio: **{dataset_profile.get('imbalance_ratio')}**\n\n")
+
+    w("**Feature Types**\n")
+    w(f"- Numeric ({len(numeric)}): {short_list(numeric)}\n")
+    w(f"- Categorical ({len(categorical)}): {short_list(categorical)}\n\n")
+
+    w("**Notes**\n")
+    if notes:
+        buf.writelines(f"- {n}\n" for n in notes)
+    else:
+        w("- (none)\n")
+
+    w("\n## Plan\n")
+    buf.writelines(f"- {t}\n" for t in plan)
+
+    w("\n## Results (Best Model)\n")
+    w(f"**Model:** `{best.get('model')}`\n\n")
+    w(f"- Accuracy: **{best.get('accuracy'):.3f}**\n")
+    w(f"- Balanced accuracy: **{best.get('balanced_accuracy'):.3f}**\n")
+    w(f"- Macro F1: **{best.get('f1_macro'):.3f}**\n")
+    w(f"- Macro Precision: **{best.get('precision_macro'):.3f}**\n")
+    w(f"- Macro Recall: **{best.get('recall_macro'):.3f}**\n\n")
+
+    w("Top metrics (all candidates):\n```json\n")
+    w(all_metrics_json)
+    w("\n```\n\n")
+
+    w("## Reflection\n")
+    if reflection and reflection.get("suggestions"):
+        buf.writelines(f"- {s}\n" for s in reflection["suggestions"])
+    else:
+        w("- (none)\n")
+
+    w("\n# Artefacts\n")
+    w(f"- Confusion matrix: {eval_payload.get('confusion_matrix_path')}\n\n")
 
     with open(out_path, "w", encoding="utf-8") as f:
-        f.write(md)
+        f.write(buf.getvalue())
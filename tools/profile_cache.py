@@ -0,0 +1,69 @@
+"""
+Disk-backed memoization for expensive per-dataset computations.
+
+Profiling and fingerprinting scan every column of the dataset, but their
+results only change when the underlying file (or the chosen target) changes.
+Cache entries are keyed on (absolute path, file size, mtime, target) so a
+warm run skips the full O(rows x cols) EDA pass entirely.
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Any, Callable
+
+# Default location for cached results, relative to the working directory.
+DEFAULT_CACHE_DIR = ".cache"
+
+
+def _cache_key(path: str, target: str) -> str:
+    """Build a stable key from file identity (path, size, mtime) and target."""
+    stat = os.stat(path)
+    ident = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{target}"
+    return hashlib.blake2b(ident.encode(), digest_size=16).hexdigest()
+
+
+def load_or_compute(
+    path: str,
+    target: str,
+    kind: str,
+    compute: Callable[[], Any],
+    cache_dir: str = DEFAULT_CACHE_DIR,
+) -> Any:
+    """
+    Return the cached result for (path, target, kind), computing and storing
+    it on a miss.
+
+    - path/target: identify the dataset and task (part of the cache key)
+    - kind: short tag distinguishing what is cached (e.g. "profile")
+    - compute: zero-argument callable producing the value on a cache miss
+
+    Cache failures (unreadable file, stale pickle, read-only filesystem) are
+    never fatal: we silently fall back to computing the value.
+    """
+    try:
+        key = _cache_key(path, target)
+    except OSError:
+        return compute()
+
+    cache_path = os.path.join(cache_dir, f"{kind}_{key}.pkl")
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # Corrupt or incompatible cache entry: recompute below.
+            pass
+
+    result = compute()
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = cache_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(result, f)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
+
+    return result